@@ -20,9 +20,6 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.gui import InstallerManagerGUI
-from src.launcher import LauncherCheck
-
 
 def main():
     parser = argparse.ArgumentParser(description='Installer Manager')
@@ -36,10 +33,12 @@ def main():
     args = parser.parse_args()
     
     if args.check:
+        from src.launcher import LauncherCheck
         checker = LauncherCheck()
         checker.run()
         return
     
+    from src.gui import InstallerManagerGUI
     app = InstallerManagerGUI(resume_mode=args.resume)
     
     if args.folder:
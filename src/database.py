@@ -2,8 +2,10 @@
 Database module for tracking installers, installed programs, and installation queue.
 Uses SQLite for persistent storage.
 """
+import os
 import sqlite3
 import json
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict, Any
@@ -26,17 +28,50 @@ class UpdateStatus(Enum):
     MANUAL_REQUIRED = "manual_required"
     INSTALLER_MISSING = "installer_missing"
 
+def normalize_path(file_path: str) -> str:
+    """Canonical form used for installer paths stored in and looked up from the database."""
+    return os.path.normcase(os.path.normpath(file_path))
+
+
 class Database:
+    PATHS_NORMALIZED_VERSION = 1
+    
     def __init__(self, db_path: str = None):
         if db_path is None:
             app_dir = Path(__file__).parent.parent
             db_path = str(app_dir / "installer_manager.db")
         
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
         self._create_tables()
     
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection owned by the calling thread, opened on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._prune_connections()
+                self._connections.append((threading.current_thread(), conn))
+        return conn
+    
+    def _prune_connections(self):
+        """Close connections left behind by worker threads that have exited."""
+        alive = []
+        for thread, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._connections = alive
+    
     def _create_tables(self):
         cursor = self.conn.cursor()
         
@@ -111,6 +146,15 @@ class Database:
             )
         """)
         
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_queue_status
+            ON installation_queue(status, queue_position)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_queue_position
+            ON installation_queue(queue_position)
+        """)
+        
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS download_history (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -128,6 +172,20 @@ class Database:
             )
         """)
         
+        cursor.execute("PRAGMA table_info(file_hash_cache)")
+        cache_columns = {row['name'] for row in cursor.fetchall()}
+        if cache_columns and 'mtime_ns' not in cache_columns:
+            cursor.execute("DROP TABLE file_hash_cache")
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS file_hash_cache (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                sha256 TEXT
+            )
+        """)
+        
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS settings (
                 key TEXT PRIMARY KEY,
@@ -146,11 +204,43 @@ class Database:
             )
         """)
         
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] < self.PATHS_NORMALIZED_VERSION:
+            self._normalize_installer_paths(cursor)
+            cursor.execute(f"PRAGMA user_version = {self.PATHS_NORMALIZED_VERSION}")
+        
         self.conn.commit()
     
+    def _normalize_installer_paths(self, cursor):
+        """
+        Rewrite installer paths saved before paths were normalized.
+        Rows that collapse onto the same path are merged into one, keeping the row already
+        stored under the normalized path (or else the newest) and repointing references to it.
+        """
+        cursor.execute("SELECT id, file_path FROM installers ORDER BY id")
+        groups = {}
+        for row in cursor.fetchall():
+            groups.setdefault(normalize_path(row['file_path']), []).append((row['id'], row['file_path']))
+        
+        for path, rows in groups.items():
+            if len(rows) == 1 and rows[0][1] == path:
+                continue
+            
+            keep_id = next((row_id for row_id, file_path in rows if file_path == path), rows[-1][0])
+            duplicate_ids = [row_id for row_id, _ in rows if row_id != keep_id]
+            if duplicate_ids:
+                for table, column in (('installation_queue', 'installer_id'),
+                                      ('download_history', 'installer_id'),
+                                      ('installed_programs', 'matched_installer_id')):
+                    cursor.executemany(f"UPDATE {table} SET {column} = ? WHERE {column} = ?",
+                                       [(keep_id, row_id) for row_id in duplicate_ids])
+                cursor.executemany("DELETE FROM installers WHERE id = ?", [(row_id,) for row_id in duplicate_ids])
+            cursor.execute("UPDATE installers SET file_path = ? WHERE id = ?", (path, keep_id))
+    
     def add_installer(self, file_path: str, file_name: str, file_size: int = None,
                       detected_name: str = None, detected_version: str = None,
                       file_type: str = None, file_hash: str = None) -> int:
+        file_path = normalize_path(file_path)
         cursor = self.conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO installers 
@@ -168,10 +258,20 @@ class Database:
     
     def get_installer_by_path(self, file_path: str) -> Optional[Dict]:
         cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM installers WHERE file_path = ?", (file_path,))
+        cursor.execute("SELECT * FROM installers WHERE file_path = ?", (normalize_path(file_path),))
         row = cursor.fetchone()
         return dict(row) if row else None
     
+    def get_installers_by_paths(self, file_paths: List[str]) -> Dict[str, Dict]:
+        """Look up several installers at once, keyed by normalized path."""
+        paths = list(dict.fromkeys(normalize_path(p) for p in file_paths))
+        if not paths:
+            return {}
+        cursor = self.conn.cursor()
+        placeholders = ', '.join('?' * len(paths))
+        cursor.execute(f"SELECT * FROM installers WHERE file_path IN ({placeholders})", paths)
+        return {row['file_path']: dict(row) for row in cursor.fetchall()}
+    
     def get_all_installers(self) -> List[Dict]:
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM installers ORDER BY file_name")
@@ -410,20 +510,28 @@ class Database:
         self.conn.commit()
         return cursor.lastrowid
     
-    def get_queue(self) -> List[Dict]:
+    def get_queue(self, limit: int = None, offset: int = 0) -> List[Dict]:
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT q.*, i.file_name, i.file_path, i.detected_name, i.detected_version
+        query = """
+            SELECT q.*, i.file_name, i.file_path, i.detected_name, i.detected_version,
+                   COALESCE(i.detected_name, i.file_name) AS display_name,
+                   COALESCE(i.detected_version, 'Unknown') AS display_version
             FROM installation_queue q
             JOIN installers i ON q.installer_id = i.id
             ORDER BY q.queue_position
-        """)
+        """
+        if limit is not None:
+            cursor.execute(query + " LIMIT ? OFFSET ?", (limit, offset))
+        else:
+            cursor.execute(query)
         return [dict(row) for row in cursor.fetchall()]
     
     def get_pending_queue_items(self) -> List[Dict]:
         cursor = self.conn.cursor()
         cursor.execute("""
-            SELECT q.*, i.file_name, i.file_path, i.detected_name, i.detected_version
+            SELECT q.id, q.installer_id, q.status, q.exit_code, q.queue_position,
+                   i.file_name, i.file_path, i.detected_name, i.detected_version,
+                   COALESCE(i.detected_name, i.file_name) AS display_name
             FROM installation_queue q
             JOIN installers i ON q.installer_id = i.id
             WHERE q.status IN ('pending', 'needs_restart', 'interrupted')
@@ -494,6 +602,24 @@ class Database:
         """, (key, value))
         self.conn.commit()
     
+    def get_cached_hash(self, file_path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Return the cached SHA-256 for a file if its size and st_mtime_ns are unchanged."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT size, mtime_ns, sha256 FROM file_hash_cache WHERE path = ?",
+                       (normalize_path(file_path),))
+        row = cursor.fetchone()
+        if row and row['size'] == size and row['mtime_ns'] == mtime_ns:
+            return row['sha256']
+        return None
+    
+    def set_cached_hash(self, file_path: str, size: int, mtime_ns: int, sha256: str):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT OR REPLACE INTO file_hash_cache (path, size, mtime_ns, sha256)
+            VALUES (?, ?, ?, ?)
+        """, (normalize_path(file_path), size, mtime_ns, sha256))
+        self.conn.commit()
+    
     def add_download(self, installer_id: int, url: str, version: str = None) -> int:
         cursor = self.conn.cursor()
         cursor.execute("""
@@ -530,4 +656,8 @@ class Database:
             self.conn.commit()
     
     def close(self):
-        self.conn.close()
+        with self._connections_lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
@@ -13,11 +13,14 @@ import tkinter as tk
 from pathlib import Path
 from typing import Optional, List, Dict, Callable
 
-from .database import Database, InstallerStatus
+from .database import Database, InstallerStatus, normalize_path
 from .scanner import InstallerScanner, InstalledProgramScanner, ProgramMatcher
 from .installer import InstallationExecutor, InstallationQueue
 from .launcher import StartupManager
 
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+QUEUE_REFRESH_INTERVAL_MS = 100
+
 
 def set_dark_title_bar(window):
     """Enable dark mode title bar on Windows 10/11."""
@@ -59,6 +62,9 @@ class InstallerManagerGUI:
         
         self.installer_folder = self.db.get_setting('installer_folder', str(Path.home() / "Downloads"))
         self.include_subfolders = self.db.get_setting('include_subfolders', 'false') == 'true'
+        self._queue_refresh_pending = False
+        self._last_status = "Ready"
+        self._pending_status = None
         
         self._create_menu()
         self._create_main_layout()
@@ -192,6 +198,23 @@ class InstallerManagerGUI:
         )
         self.progress.pack(side=RIGHT)
     
+    def _set_status(self, message: str):
+        """
+        Queue a status bar update; repeated updates within one idle cycle are merged.
+        Must be called on the Tk thread; worker threads hand off via root.after.
+        """
+        scheduled = self._pending_status is not None
+        self._pending_status = message
+        if not scheduled:
+            self.root.after_idle(self._flush_status)
+    
+    def _flush_status(self):
+        """Write the latest queued status message to the status bar if it changed."""
+        message, self._pending_status = self._pending_status, None
+        if message is not None and message != self._last_status:
+            self._last_status = message
+            self.status_var.set(message)
+    
     def _create_installers_tab(self):
         """Create the Installers tab."""
         tab = ttk.Frame(self.notebook, padding=15)
@@ -246,6 +269,15 @@ class InstallerManagerGUI:
         
         self.installers_tree.bind('<Double-1>', self._on_installer_double_click)
         self.installers_tree.bind('<Button-3>', self._show_installer_context_menu)
+        
+        self.installer_menu = tk.Menu(self.root, tearoff=0)
+        self.installer_menu.add_command(label="Add to Queue", command=self._add_selected_to_queue)
+        self.installer_menu.add_separator()
+        self.installer_menu.add_command(
+            label="Open Folder",
+            command=self._open_installer_folder,
+            state=NORMAL if os.name == 'nt' else DISABLED
+        )
     
     def _create_installed_tab(self):
         """Create the Installed Programs tab."""
@@ -444,12 +476,12 @@ class InstallerManagerGUI:
     
     def _scan_installers(self):
         """Scan the installer folder."""
-        self.status_var.set("Scanning installer folder...")
+        self._set_status("Scanning installer folder...")
         self.progress.configure(mode='indeterminate')
         self.progress.start()
         
         def scan():
-            scanner = InstallerScanner(self.installer_folder, self.include_subfolders)
+            scanner = InstallerScanner(self.installer_folder, self.include_subfolders, hash_cache=self.db)
             installers = scanner.scan()
             
             for item in self.installers_tree.get_children():
@@ -475,11 +507,11 @@ class InstallerManagerGUI:
         """Finish scan and update UI."""
         self.progress.stop()
         self.progress.configure(mode='determinate')
-        self.status_var.set(f"Found {count} installer(s)")
+        self._set_status(f"Found {count} installer(s)")
     
     def _scan_installed(self):
         """Scan for installed programs."""
-        self.status_var.set("Scanning installed programs...")
+        self._set_status("Scanning installed programs...")
         self.progress.configure(mode='indeterminate')
         self.progress.start()
         
@@ -531,7 +563,7 @@ class InstallerManagerGUI:
         self.progress.stop()
         self.progress.configure(mode='determinate')
         orphaned = total - matched
-        self.status_var.set(f"Found {total} installed programs ({matched} have installers, {orphaned} missing)")
+        self._set_status(f"Found {total} installed programs ({matched} have installers, {orphaned} missing)")
     
     def _refresh_installed_list(self):
         """Refresh the installed programs list based on filter."""
@@ -622,7 +654,7 @@ class InstallerManagerGUI:
                 self.db.hide_program(int(tags[0]))
                 count += 1
         self._refresh_installed_list()
-        self.status_var.set(f"{count} program(s) hidden")
+        self._set_status(f"{count} program(s) hidden")
     
     def _unhide_program(self, program_id: int):
         """Unhide all selected programs."""
@@ -634,7 +666,7 @@ class InstallerManagerGUI:
                 self.db.unhide_program(int(tags[0]))
                 count += 1
         self._refresh_installed_list()
-        self.status_var.set(f"{count} program(s) unhidden")
+        self._set_status(f"{count} program(s) unhidden")
     
     def _link_to_installer(self, program_id: int):
         """Link a program to an installer file."""
@@ -647,10 +679,8 @@ class InstallerManagerGUI:
         if file_path:
             installer = self.db.get_installer_by_path(file_path)
             if not installer:
-                from pathlib import Path
-                from .scanner import InstallerScanner
-                scanner = InstallerScanner(self.installer_folder, False)
-                info = scanner._analyze_installer(Path(file_path))
+                scanner = InstallerScanner(self.installer_folder, False, hash_cache=self.db)
+                info = scanner.analyze_file(file_path)
                 if info:
                     installer_id = self.db.add_installer(**info)
                     installer = self.db.get_installer(installer_id)
@@ -658,13 +688,13 @@ class InstallerManagerGUI:
             if installer:
                 self.db.link_program_to_installer(program_id, installer['id'])
                 self._refresh_installed_list()
-                self.status_var.set("Program linked to installer")
+                self._set_status("Program linked to installer")
     
     def _remove_installer_link(self, program_id: int):
         """Remove installer link from a program."""
         self.db.unlink_program_from_installer(program_id)
         self._refresh_installed_list()
-        self.status_var.set("Installer link removed")
+        self._set_status("Installer link removed")
     
     def _set_as_parent(self, program_id: int):
         """Set a program as parent for grouping related programs."""
@@ -678,7 +708,7 @@ class InstallerManagerGUI:
                     if child_id != parent_id:
                         self.db.set_program_parent(child_id, parent_id)
             self._refresh_installed_list()
-            self.status_var.set("Programs grouped")
+            self._set_status("Programs grouped")
         else:
             Messagebox.show_info("Select multiple programs first, then right-click the parent program", title="Info")
     
@@ -686,7 +716,7 @@ class InstallerManagerGUI:
         """Remove a program from its parent group."""
         self.db.ungroup_program(program_id)
         self._refresh_installed_list()
-        self.status_var.set("Program ungrouped")
+        self._set_status("Program ungrouped")
     
     def _add_selected_to_queue(self):
         """Add selected installers to the installation queue."""
@@ -695,17 +725,21 @@ class InstallerManagerGUI:
             Messagebox.show_info("Please select installers to add to queue", title="Info")
             return
         
+        paths = []
         for item in selected:
             tags = self.installers_tree.item(item, 'tags')
             if tags:
-                file_path = tags[0]
-                installer = self.db.get_installer_by_path(file_path)
-                if installer:
-                    self.db.add_to_queue(installer['id'])
+                paths.append(normalize_path(tags[0]))
+        
+        installers = self.db.get_installers_by_paths(paths)
+        for file_path in paths:
+            installer = installers.get(file_path)
+            if installer:
+                self.db.add_to_queue(installer['id'])
         
         self._refresh_queue()
         self.notebook.select(2)
-        self.status_var.set(f"Added {len(selected)} installer(s) to queue")
+        self._set_status(f"Added {len(selected)} installer(s) to queue")
     
     def _refresh_queue(self):
         """Refresh the installation queue display."""
@@ -725,8 +759,8 @@ class InstallerManagerGUI:
             
             self.queue_tree.insert('', 'end', values=(
                 i + 1,
-                item.get('detected_name') or item.get('file_name'),
-                item.get('detected_version') or 'Unknown',
+                item['display_name'],
+                item['display_version'],
                 status,
                 exit_code
             ), tags=(str(item['id']),))
@@ -736,6 +770,18 @@ class InstallerManagerGUI:
             summary += f" | Needs Restart: {needs_restart}"
         self.queue_summary_var.set(summary)
     
+    def _schedule_queue_refresh(self):
+        """Coalesce queue refresh requests from the install thread into one repaint."""
+        if self._queue_refresh_pending:
+            return
+        self._queue_refresh_pending = True
+        self.root.after(QUEUE_REFRESH_INTERVAL_MS, self._flush_queue_refresh)
+    
+    def _flush_queue_refresh(self):
+        """Run a scheduled queue refresh."""
+        self._queue_refresh_pending = False
+        self._refresh_queue()
+    
     def _start_installation(self):
         """Start the installation queue."""
         queue = self.db.get_pending_queue_items()
@@ -752,17 +798,17 @@ class InstallerManagerGUI:
                 self.executor.request_elevation()
             return
         
-        self.status_var.set("Starting installations...")
+        self._set_status("Starting installations...")
         
         def install_loop():
             for item in queue:
                 queue_id = item['id']
                 file_path = item['file_path']
-                name = item.get('detected_name') or item.get('file_name')
+                name = item['display_name']
                 
-                self.root.after(0, lambda n=name: self.status_var.set(f"Installing: {n}"))
+                self.root.after(0, self._set_status, f"Installing: {name}")
                 self.db.update_queue_status(queue_id, 'installing')
-                self.root.after(0, self._refresh_queue)
+                self._schedule_queue_refresh()
                 
                 result = self.executor.run_installer(file_path)
                 
@@ -779,17 +825,17 @@ class InstallerManagerGUI:
                 else:
                     self.db.update_queue_status(queue_id, 'failed', result.exit_code, result.error_message)
                 
-                self.root.after(0, self._refresh_queue)
+                self._schedule_queue_refresh()
             
             self.db.clear_session_state()
-            self.root.after(0, lambda: self.status_var.set("All installations complete"))
+            self.root.after(0, self._set_status, "All installations complete")
             self.root.after(0, lambda: Messagebox.show_info("All installations have been processed", title="Complete"))
         
         threading.Thread(target=install_loop, daemon=True).start()
     
     def _prompt_restart(self, item: Dict):
         """Prompt user about restart requirement."""
-        name = item.get('detected_name') or item.get('file_name')
+        name = item['display_name']
         pending = self.db.get_pending_queue_items()
         
         message = f"'{name}' requires a system restart.\n\n"
@@ -801,14 +847,14 @@ class InstallerManagerGUI:
     
     def _pause_installation(self):
         """Pause the installation queue."""
-        self.status_var.set("Installation paused")
+        self._set_status("Installation paused")
     
     def _clear_queue(self):
         """Clear the installation queue."""
         if Messagebox.yesno("Clear all items from the installation queue?", title="Confirm") == "Yes":
             self.db.clear_queue()
             self._refresh_queue()
-            self.status_var.set("Queue cleared")
+            self._set_status("Queue cleared")
     
     def _move_queue_up(self):
         """Move selected item up in queue."""
@@ -836,11 +882,12 @@ class InstallerManagerGUI:
     
     def _show_installer_context_menu(self, event):
         """Show context menu for installers."""
-        menu = tk.Menu(self.root, tearoff=0)
-        menu.add_command(label="Add to Queue", command=self._add_selected_to_queue)
-        menu.add_separator()
-        menu.add_command(label="Open Folder", command=lambda: os.startfile(self.installer_folder) if os.name == 'nt' else None)
-        menu.post(event.x_root, event.y_root)
+        self.installer_menu.post(event.x_root, event.y_root)
+    
+    def _open_installer_folder(self):
+        """Open the installer folder in Explorer."""
+        if os.name == 'nt':
+            os.startfile(self.installer_folder)
     
     def _check_pending_installations(self):
         """Check for pending installations on startup."""
@@ -875,14 +922,14 @@ class InstallerManagerGUI:
                 writer.writeheader()
                 for item in queue:
                     writer.writerow({
-                        'name': item.get('detected_name') or item.get('file_name'),
+                        'name': item['display_name'],
                         'version': item.get('detected_version'),
                         'status': item.get('status'),
                         'exit_code': item.get('exit_code'),
                         'file_path': item.get('file_path')
                     })
             
-            self.status_var.set(f"Exported to {filename}")
+            self._set_status(f"Exported to {filename}")
     
     def _export_json(self):
         """Export installation log to JSON."""
@@ -901,15 +948,14 @@ class InstallerManagerGUI:
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(queue, f, indent=2, default=str)
             
-            self.status_var.set(f"Exported to {filename}")
+            self._set_status(f"Exported to {filename}")
     
     def _format_size(self, size: int) -> str:
         """Format file size in human-readable format."""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024:
-                return f"{size:.1f} {unit}"
-            size /= 1024
-        return f"{size:.1f} TB"
+        if size is None or size <= 0:
+            return "0.0 B"
+        exp = min((int(size).bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size / (1 << (exp * 10)):.1f} {SIZE_UNITS[exp]}"
     
     def _show_about(self):
         """Show about dialog."""
@@ -3,8 +3,10 @@ Installation executor module.
 Handles running installers and detecting restart requirements.
 """
 import os
+import random
 import subprocess
 import logging
+import time
 from pathlib import Path
 from typing import Dict, Optional, Callable
 from enum import Enum
@@ -12,6 +14,22 @@ from enum import Enum
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SUCCESS_EXIT_CODES = frozenset({0, 3010, 1641})
+RESTART_EXIT_CODES = frozenset({3010, 1641})
+
+ERROR_MESSAGES = {
+    1602: "Installation cancelled by user",
+    1618: "Another installation is already in progress",
+    1619: "Installation package could not be opened",
+    1620: "Installation package is invalid",
+    1622: "Error opening installation log file",
+    1625: "Installation prohibited by system policy",
+    1638: "Another version is already installed",
+}
+
+SIMULATED_EXIT_CODES = (0, 0, 0, 3010, 1602)
+_simulation_random = random.Random()
+
 
 class ExitCode(Enum):
     SUCCESS = 0
@@ -37,21 +55,11 @@ class InstallResult:
     @classmethod
     def from_exit_code(cls, installer_path: str, exit_code: int):
         """Create result from installer exit code."""
-        success = exit_code in (0, 3010, 1641)
-        restart_required = exit_code in (3010, 1641)
-        
-        error_message = None
-        if not success:
-            error_messages = {
-                1602: "Installation cancelled by user",
-                1618: "Another installation is already in progress",
-                1619: "Installation package could not be opened",
-                1620: "Installation package is invalid",
-                1622: "Error opening installation log file",
-                1625: "Installation prohibited by system policy",
-                1638: "Another version is already installed",
-            }
-            error_message = error_messages.get(exit_code, f"Installation failed with exit code {exit_code}")
+        success = exit_code in SUCCESS_EXIT_CODES
+        restart_required = exit_code in RESTART_EXIT_CODES
+        error_message = None if success else ERROR_MESSAGES.get(
+            exit_code, f"Installation failed with exit code {exit_code}"
+        )
         
         return cls(
             installer_path=installer_path,
@@ -183,20 +191,8 @@ class InstallationExecutor:
     
     def _simulate_installation(self, installer_path: str) -> InstallResult:
         """Simulate installation for non-Windows development."""
-        import random
-        import time
-        
         time.sleep(0.5)
-        
-        outcomes = [
-            (0, False),
-            (0, False),
-            (0, False),
-            (3010, True),
-            (1602, False),
-        ]
-        
-        exit_code, restart = random.choice(outcomes)
+        exit_code = _simulation_random.choice(SIMULATED_EXIT_CODES)
         return InstallResult.from_exit_code(installer_path, exit_code)
     
     def check_elevation(self) -> bool:
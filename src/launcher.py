@@ -4,10 +4,9 @@ This runs without admin privileges to show notifications.
 """
 import os
 import sys
-import json
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,19 +17,58 @@ class StartupManager:
     
     STARTUP_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
     APP_NAME = "InstallerManager"
+    FROZEN_LAUNCHER_ENV = "INSTALLER_MANAGER_LAUNCHER_EXE"
     
     def __init__(self):
         self.is_windows = os.name == 'nt'
         self.launcher_path = self._get_launcher_path()
+        self._run_key = None
     
     def _get_launcher_path(self) -> str:
-        """Get path to the launcher script."""
+        """
+        Get path to the launcher.
+        
+        A frozen launcher (e.g. built with `pyinstaller --onefile src/launcher_check.py`)
+        is only used when its path is set explicitly in INSTALLER_MANAGER_LAUNCHER_EXE,
+        since it skips Python interpreter startup at login.
+        """
+        frozen_path = os.environ.get(self.FROZEN_LAUNCHER_ENV)
+        if frozen_path and Path(frozen_path).is_file():
+            return str(Path(frozen_path).resolve())
+        
         launcher_path = Path(__file__).parent / "launcher_check.py"
         if launcher_path.exists():
             return str(launcher_path)
         main_path = Path(__file__).parent.parent / "main.py"
         return str(main_path)
     
+    def _get_run_key(self):
+        """Get the Run key handle, opening it once for reads and writes."""
+        if self._run_key is None:
+            import winreg
+            
+            self._run_key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER,
+                self.STARTUP_KEY,
+                0,
+                winreg.KEY_READ | winreg.KEY_SET_VALUE
+            )
+        return self._run_key
+    
+    def close(self):
+        """Close the Run key handle."""
+        if self._run_key is not None:
+            import winreg
+            
+            winreg.CloseKey(self._run_key)
+            self._run_key = None
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
     def register_startup(self) -> bool:
         """Register the launcher to run at Windows startup."""
         if not self.is_windows:
@@ -40,21 +78,16 @@ class StartupManager:
         try:
             import winreg
             
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                self.STARTUP_KEY,
-                0,
-                winreg.KEY_SET_VALUE
-            )
-            
             python_exe = sys.executable
-            if self.launcher_path.endswith('main.py'):
+            if self.launcher_path.endswith('.exe'):
+                main_path = Path(__file__).parent.parent / "main.py"
+                command = f'"{self.launcher_path}" --python "{python_exe}" --main "{main_path}"'
+            elif self.launcher_path.endswith('main.py'):
                 command = f'"{python_exe}" "{self.launcher_path}" --check'
             else:
                 command = f'"{python_exe}" "{self.launcher_path}"'
             
-            winreg.SetValueEx(key, self.APP_NAME, 0, winreg.REG_SZ, command)
-            winreg.CloseKey(key)
+            winreg.SetValueEx(self._get_run_key(), self.APP_NAME, 0, winreg.REG_SZ, command)
             
             logger.info("Registered startup entry")
             return True
@@ -71,19 +104,11 @@ class StartupManager:
         try:
             import winreg
             
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                self.STARTUP_KEY,
-                0,
-                winreg.KEY_SET_VALUE
-            )
-            
             try:
-                winreg.DeleteValue(key, self.APP_NAME)
+                winreg.DeleteValue(self._get_run_key(), self.APP_NAME)
             except FileNotFoundError:
                 pass
             
-            winreg.CloseKey(key)
             logger.info("Removed startup entry")
             return True
         
@@ -99,19 +124,10 @@ class StartupManager:
         try:
             import winreg
             
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER,
-                self.STARTUP_KEY,
-                0,
-                winreg.KEY_READ
-            )
-            
             try:
-                winreg.QueryValueEx(key, self.APP_NAME)
-                winreg.CloseKey(key)
+                winreg.QueryValueEx(self._get_run_key(), self.APP_NAME)
                 return True
             except FileNotFoundError:
-                winreg.CloseKey(key)
                 return False
         
         except Exception:
@@ -121,6 +137,10 @@ class StartupManager:
 class NotificationManager:
     """Manages toast notifications for pending installations."""
     
+    TOAST_APP_ID = "InstallerManager.Launcher"
+    TOAST_APP_NAME = "Installer Manager"
+    TOAST_TIMEOUT = 60
+    
     def __init__(self):
         self.is_windows = os.name == 'nt'
     
@@ -134,7 +154,94 @@ class NotificationManager:
     
     def _show_windows_notification(self, title: str, message: str, 
                                     on_click: callable = None) -> bool:
-        """Show Windows toast notification."""
+        """
+        Show Windows toast notification, falling back to a Tk dialog without winsdk,
+        or when the toast could not be shown or got no answer within TOAST_TIMEOUT.
+        """
+        try:
+            if self._show_toast_notification(title, message, on_click):
+                return True
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to show toast notification: {e}")
+        
+        return self._show_dialog_notification(title, message, on_click)
+    
+    def _register_toast_app_id(self):
+        """Register this app's own AppUserModelID so unpackaged toasts are attributed to it."""
+        import winreg
+        
+        with winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER,
+                                rf"Software\Classes\AppUserModelId\{self.TOAST_APP_ID}",
+                                0, winreg.KEY_SET_VALUE) as key:
+            winreg.SetValueEx(key, "DisplayName", 0, winreg.REG_SZ, self.TOAST_APP_NAME)
+    
+    def _show_toast_notification(self, title: str, message: str,
+                                 on_click: callable = None) -> bool:
+        """
+        Show a native WinRT reminder toast with Yes/No actions. Raises ImportError without winsdk.
+        Returns False, with the toast withdrawn, if it failed or was left unanswered.
+        """
+        import threading
+        from xml.sax.saxutils import escape
+        from winsdk.windows.data.xml.dom import XmlDocument
+        from winsdk.windows.ui.notifications import (
+            ToastActivatedEventArgs, ToastDismissalReason, ToastNotification, ToastNotificationManager
+        )
+        
+        self._register_toast_app_id()
+        
+        xml = XmlDocument()
+        xml.load_xml(
+            '<toast activationType="foreground" launch="yes" scenario="reminder">'
+            '<visual><binding template="ToastGeneric">'
+            f'<text>{escape(title)}</text><text>{escape(message)}</text>'
+            '</binding></visual>'
+            '<actions>'
+            '<action content="Yes" arguments="yes" activationType="foreground"/>'
+            '<action content="No" arguments="no" activationType="foreground"/>'
+            '</actions>'
+            '</toast>'
+        )
+        
+        toast = ToastNotification(xml)
+        finished = threading.Event()
+        outcome = {'accepted': False, 'answered': False}
+        
+        def on_activated(sender, args):
+            outcome['accepted'] = ToastActivatedEventArgs._from(args).arguments == 'yes'
+            outcome['answered'] = True
+            finished.set()
+        
+        def on_dismissed(sender, args):
+            if args.reason == ToastDismissalReason.USER_CANCELED:
+                outcome['answered'] = True
+                finished.set()
+        
+        toast.add_activated(on_activated)
+        toast.add_dismissed(on_dismissed)
+        toast.add_failed(lambda sender, args: finished.set())
+        
+        notifier = ToastNotificationManager.create_toast_notifier(self.TOAST_APP_ID)
+        notifier.show(toast)
+        finished.wait(self.TOAST_TIMEOUT)
+        
+        if not outcome['answered']:
+            try:
+                notifier.hide(toast)
+            except Exception:
+                pass
+            return False
+        
+        if outcome['accepted'] and on_click:
+            on_click()
+        
+        return True
+    
+    def _show_dialog_notification(self, title: str, message: str,
+                                  on_click: callable = None) -> bool:
+        """Show a Tk yes/no dialog."""
         try:
             from tkinter import messagebox
             import tkinter as tk
@@ -171,75 +278,109 @@ class NotificationManager:
 class LauncherCheck:
     """Checks for pending installations on startup."""
     
-    def __init__(self):
+    def __init__(self, python_exe: str = None, main_script: str = None):
         self.db_path = Path.home() / ".installer_manager" / "installer_manager.db"
         self.notification_manager = NotificationManager()
+        self.python_exe = python_exe
+        self.main_script = main_script
+        self._conn = None
+        self._results = None
     
-    def check_pending_installations(self) -> Optional[int]:
-        """Check database for pending installations. Returns count or None."""
-        if not self.db_path.exists():
-            return None
-        
-        try:
+    def _get_conn(self):
+        """Get the shared database connection, opening it on first use."""
+        if self._conn is None:
             import sqlite3
             
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT COUNT(*) FROM installation_queue 
-                WHERE status IN ('pending', 'needs_restart', 'interrupted')
-            """)
-            
-            count = cursor.fetchone()[0]
-            conn.close()
-            
-            return count if count > 0 else None
-        
-        except Exception as e:
-            logger.error(f"Failed to check pending installations: {e}")
-            return None
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
     
-    def check_session_state(self) -> Optional[dict]:
-        """Check for interrupted session state."""
+    def close(self):
+        """Close the shared database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
+    def _check_all(self) -> Tuple[Optional[int], Optional[dict]]:
+        """Read the pending count and session state in one query. Results are cached."""
+        if self._results is None:
+            self._results = self._query_startup_state()
+        return self._results
+    
+    def _query_startup_state(self) -> Tuple[Optional[int], Optional[dict]]:
         if not self.db_path.exists():
-            return None
+            return None, None
         
         try:
-            import sqlite3
+            import json
             
-            conn = sqlite3.connect(str(self.db_path))
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            cursor = self._get_conn().cursor()
             
-            cursor.execute("SELECT * FROM session_state WHERE id = 1")
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM installation_queue
+                        WHERE status IN ('pending', 'needs_restart', 'interrupted')) AS pending_count,
+                       s.is_resuming, s.pending_installations, s.current_position
+                FROM (SELECT 1) LEFT JOIN session_state s ON s.id = 1
+            """)
             row = cursor.fetchone()
-            conn.close()
             
-            if row and row['is_resuming']:
-                return {
+            count = row['pending_count'] if row['pending_count'] > 0 else None
+            
+            session_state = None
+            if row['is_resuming']:
+                session_state = {
                     'pending_installations': json.loads(row['pending_installations']) if row['pending_installations'] else [],
                     'current_position': row['current_position']
                 }
             
-            return None
+            return count, session_state
         
         except Exception as e:
-            logger.error(f"Failed to check session state: {e}")
-            return None
+            logger.error(f"Failed to check pending installations: {e}")
+            return None, None
+    
+    def _main_app_command(self) -> Optional[list]:
+        """
+        Command that opens the main app in resume mode.
+        A frozen launcher cannot use its own sys.executable or bundled __file__, so it relies on
+        the interpreter and main.py recorded in the startup entry.
+        """
+        if getattr(sys, 'frozen', False):
+            if not (self.python_exe and self.main_script and Path(self.main_script).is_file()):
+                return None
+            return [self.python_exe, self.main_script, "--resume"]
+        
+        python_exe = self.python_exe or sys.executable
+        main_script = self.main_script or str(Path(__file__).parent.parent / "main.py")
+        return [python_exe, main_script, "--resume"]
+    
+    def check_pending_installations(self) -> Optional[int]:
+        """Check database for pending installations. Returns count or None."""
+        return self._check_all()[0]
+    
+    def check_session_state(self) -> Optional[dict]:
+        """Check for interrupted session state."""
+        return self._check_all()[1]
     
     def run(self):
         """Run startup check and show notification if needed."""
-        pending_count = self.check_pending_installations()
-        session_state = self.check_session_state()
+        try:
+            pending_count, session_state = self._check_all()
+        finally:
+            self.close()
         
         if pending_count or session_state:
             count = pending_count or len(session_state.get('pending_installations', []))
             
             def launch_main_app():
                 import subprocess
-                main_app = Path(__file__).parent.parent / "main.py"
-                subprocess.Popen([sys.executable, str(main_app), "--resume"])
+                command = self._main_app_command()
+                if command:
+                    subprocess.Popen(command)
+                else:
+                    logger.error("Cannot locate the main application to resume installations")
             
             self.notification_manager.show_notification(
                 "Installer Manager",
@@ -249,9 +390,21 @@ class LauncherCheck:
             )
 
 
+def parse_launcher_args(argv=None):
+    """Parse the interpreter and main.py recorded in a frozen launcher's startup entry."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Installer Manager launcher check')
+    parser.add_argument('--python', help='Python interpreter used to open the main app')
+    parser.add_argument('--main', help='Path to main.py')
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
 def main():
     """Entry point for launcher check."""
-    checker = LauncherCheck()
+    args = parse_launcher_args()
+    checker = LauncherCheck(python_exe=args.python, main_script=args.main)
     checker.run()
 
 
@@ -8,12 +8,13 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.launcher import LauncherCheck
+from src.launcher import LauncherCheck, parse_launcher_args
 
 
 def main():
     """Entry point for launcher check."""
-    checker = LauncherCheck()
+    args = parse_launcher_args()
+    checker = LauncherCheck(python_exe=args.python, main_script=args.main)
     checker.run()
 
 
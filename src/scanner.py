@@ -4,12 +4,107 @@ Scanner module for detecting installers and installed programs.
 import os
 import re
 import hashlib
+from stat import S_IFREG
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import BinaryIO, Iterator, List, Dict, Optional, Tuple
 from packaging import version as pkg_version
 
+
+class _FindDataEntry:
+    """Minimal os.DirEntry stand-in for files listed through FindFirstFileExW."""
+    
+    __slots__ = ('path', 'name', '_stat')
+    
+    def __init__(self, path: str, name: str, stat_result: os.stat_result):
+        self.path = path
+        self.name = name
+        self._stat = stat_result
+    
+    def stat(self) -> os.stat_result:
+        return self._stat
+
+
+def _load_win32_find_api():
+    """Bind FindFirstFileExW/FindNextFileW/FindClose from kernel32. Windows only."""
+    import ctypes
+    from ctypes import wintypes
+    
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    find_first = kernel32.FindFirstFileExW
+    find_first.argtypes = [wintypes.LPCWSTR, ctypes.c_int, ctypes.c_void_p,
+                           ctypes.c_int, ctypes.c_void_p, wintypes.DWORD]
+    find_first.restype = wintypes.HANDLE
+    find_next = kernel32.FindNextFileW
+    find_next.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.WIN32_FIND_DATAW)]
+    find_next.restype = wintypes.BOOL
+    find_close = kernel32.FindClose
+    find_close.argtypes = [wintypes.HANDLE]
+    return find_first, find_next, find_close
+
+
+def _iter_win32_large_fetch(root: str, file_filter, find_api) -> Iterator[_FindDataEntry]:
+    """
+    Recursively list files under root with FindFirstFileExW(FIND_FIRST_EX_LARGE_FETCH),
+    yielding entries whose names pass file_filter.
+    """
+    import ctypes
+    from ctypes import wintypes
+    
+    FIND_EX_INFO_BASIC = 1
+    FIND_EX_SEARCH_NAME_MATCH = 0
+    FIND_FIRST_EX_LARGE_FETCH = 2
+    FILE_ATTRIBUTE_DIRECTORY = 0x10
+    FILE_ATTRIBUTE_REPARSE_POINT = 0x400
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+    EPOCH_AS_FILETIME = 116444736000000000
+    
+    find_first, find_next, find_close = find_api
+    
+    def filetime_to_ns(ft) -> int:
+        return (((ft.dwHighDateTime << 32) | ft.dwLowDateTime) - EPOCH_AS_FILETIME) * 100
+    
+    data = wintypes.WIN32_FIND_DATAW()
+    pending = deque([root])
+    while pending:
+        directory = pending.popleft()
+        handle = find_first(os.path.join(directory, '*'), FIND_EX_INFO_BASIC, ctypes.byref(data),
+                            FIND_EX_SEARCH_NAME_MATCH, None, FIND_FIRST_EX_LARGE_FETCH)
+        if handle is None or handle == INVALID_HANDLE_VALUE:
+            continue
+        try:
+            while True:
+                name = data.cFileName
+                attributes = data.dwFileAttributes
+                if attributes & FILE_ATTRIBUTE_DIRECTORY:
+                    if name not in ('.', '..') and not attributes & FILE_ATTRIBUTE_REPARSE_POINT:
+                        pending.append(os.path.join(directory, name))
+                elif file_filter(name):
+                    size = (data.nFileSizeHigh << 32) | data.nFileSizeLow
+                    times_ns = [filetime_to_ns(data.ftLastAccessTime),
+                                filetime_to_ns(data.ftLastWriteTime),
+                                filetime_to_ns(data.ftCreationTime)]
+                    # Same seconds/float/ns fields os.stat fills in, so either source hits the hash cache.
+                    splits = [divmod(ns, 1_000_000_000) for ns in times_ns]
+                    stat_result = os.stat_result((
+                        S_IFREG, 0, 0, 0, 0, 0, size,
+                        *(sec for sec, _ in splits),
+                        *(sec + nsec * 1e-9 for sec, nsec in splits),
+                        *times_ns,
+                    ))
+                    yield _FindDataEntry(os.path.join(directory, name), name, stat_result)
+                
+                if not find_next(handle, ctypes.byref(data)):
+                    break
+        finally:
+            find_close(handle)
+
+
 class InstallerScanner:
     INSTALLER_EXTENSIONS = {'.exe', '.msi'}
+    MAX_HASH_WORKERS = 8
+    HASH_CHUNK_SIZE = 1 << 20
     
     VERSION_PATTERNS = [
         r'[_\-\s]v?(\d+\.\d+\.\d+\.\d+)',
@@ -24,41 +119,97 @@ class InstallerScanner:
         'offline', 'online', 'web'
     ]
     
-    def __init__(self, folder_path: str, include_subfolders: bool = False):
+    _VERSION_RES = [re.compile(p, re.IGNORECASE) for p in VERSION_PATTERNS]
+    _SUFFIX_RE = re.compile(
+        r'[_\-\s]*(?:' + '|'.join(re.escape(s) for s in COMMON_SUFFIXES) + r')[_\-\s]*',
+        re.IGNORECASE
+    )
+    _DASH_RE = re.compile(r'[_\-]+')
+    
+    def __init__(self, folder_path: str, include_subfolders: bool = False, hash_cache=None,
+                 hash_files: bool = False):
         self.folder_path = Path(folder_path)
         self.include_subfolders = include_subfolders
+        self.hash_cache = hash_cache
+        self.hash_files = hash_files
     
     def scan(self) -> List[Dict]:
-        """Scan folder for installer files."""
-        installers = []
+        """
+        Scan folder for installer files.
         
+        Unless hash_files is set, file_hash is only filled from the hash cache;
+        use get_hash() when a hash is actually needed.
+        """
         if not self.folder_path.exists():
-            return installers
+            return []
         
-        if self.include_subfolders:
-            files = self.folder_path.rglob('*')
-        else:
-            files = self.folder_path.glob('*')
+        found = list(self._iter_installer_files(str(self.folder_path)))
+        if not found:
+            return []
         
-        for file_path in files:
-            if file_path.is_file() and file_path.suffix.lower() in self.INSTALLER_EXTENSIONS:
-                installer_info = self._analyze_installer(file_path)
-                installers.append(installer_info)
+        if not self.hash_files:
+            return [self._analyze_installer(entry) for entry in found]
         
-        return installers
+        max_workers = min(self.MAX_HASH_WORKERS, (os.cpu_count() or 1) * 2, len(found))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self._analyze_installer, found))
+    
+    def _iter_installer_files(self, root: str) -> Iterator[os.DirEntry]:
+        """Yield installer file entries, walking subfolders breadth-first if enabled."""
+        if self.include_subfolders and os.name == 'nt':
+            try:
+                find_api = _load_win32_find_api()
+            except (ImportError, AttributeError, OSError):
+                find_api = None
+            if find_api:
+                yield from _iter_win32_large_fetch(root, self._is_installer_name, find_api)
+                return
+        
+        pending = deque([root])
+        while pending:
+            directory = pending.popleft()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if self.include_subfolders and entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif self._is_installer_name(entry.name) and entry.is_file():
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+    
+    @staticmethod
+    def _is_installer_name(name: str) -> bool:
+        """Check for a .exe/.msi extension using a fixed 4-character suffix slice."""
+        return len(name) > 4 and name[-4:].lower() in InstallerScanner.INSTALLER_EXTENSIONS
+    
+    def analyze_file(self, file_path: str) -> Dict:
+        """Extract information from an installer file found outside a folder scan."""
+        file_path = str(file_path)
+        return self._build_installer_info(file_path, os.path.basename(file_path), os.stat(file_path))
     
-    def _analyze_installer(self, file_path: Path) -> Dict:
-        """Extract information from an installer file."""
-        file_name = file_path.name
-        file_size = file_path.stat().st_size
-        file_type = file_path.suffix.lower()
+    def _analyze_installer(self, entry: os.DirEntry) -> Dict:
+        """Extract information from a scanned installer entry."""
+        return self._build_installer_info(entry.path, entry.name, entry.stat())
+    
+    def _build_installer_info(self, file_path: str, file_name: str, stat: os.stat_result) -> Dict:
+        file_size = stat.st_size
+        file_type = os.path.splitext(file_name)[1].lower()
         
         detected_name, detected_version = self._parse_filename(file_name)
         
-        file_hash = self._calculate_hash(file_path)
+        if self.hash_files:
+            file_hash = self._get_hash(file_path, file_size, stat.st_mtime_ns)
+        elif self.hash_cache is not None:
+            file_hash = self.hash_cache.get_cached_hash(file_path, file_size, stat.st_mtime_ns)
+        else:
+            file_hash = None
         
         return {
-            'file_path': str(file_path),
+            'file_path': file_path,
             'file_name': file_name,
             'file_size': file_size,
             'file_type': file_type,
@@ -69,34 +220,62 @@ class InstallerScanner:
     
     def _parse_filename(self, filename: str) -> Tuple[Optional[str], Optional[str]]:
         """Parse filename to extract program name and version."""
-        name_without_ext = Path(filename).stem
+        name_without_ext = os.path.splitext(filename)[0]
         
         detected_version = None
-        for pattern in self.VERSION_PATTERNS:
-            match = re.search(pattern, name_without_ext, re.IGNORECASE)
+        for version_re in self._VERSION_RES:
+            match = version_re.search(name_without_ext)
             if match:
                 detected_version = match.group(1)
                 name_without_ext = name_without_ext[:match.start()]
                 break
         
-        name = name_without_ext
-        for suffix in self.COMMON_SUFFIXES:
-            pattern = rf'[_\-\s]*{suffix}[_\-\s]*'
-            name = re.sub(pattern, ' ', name, flags=re.IGNORECASE)
-        
-        name = re.sub(r'[_\-]+', ' ', name)
+        name = self._SUFFIX_RE.sub(' ', name_without_ext)
+        name = self._DASH_RE.sub(' ', name)
         name = ' '.join(name.split())
         name = name.strip()
         
         return name if name else None, detected_version
     
+    def get_hash(self, file_path: str) -> str:
+        """Return the hash of an installer file, computing and caching it on first use."""
+        stat = os.stat(file_path)
+        return self._get_hash(str(file_path), stat.st_size, stat.st_mtime_ns)
+    
+    def _get_hash(self, file_path: str, size: int, mtime_ns: int) -> str:
+        """Return the file hash, reusing the cached value when the file is unchanged."""
+        if self.hash_cache is None:
+            return self._calculate_hash(file_path)
+        
+        file_hash = self.hash_cache.get_cached_hash(file_path, size, mtime_ns)
+        if file_hash is None:
+            file_hash = self._calculate_hash(file_path)
+            self.hash_cache.set_cached_hash(file_path, size, mtime_ns, file_hash)
+        return file_hash
+    
+    @staticmethod
+    def _open_sequential(file_path) -> BinaryIO:
+        """Open a file unbuffered for a single front-to-back read, hinting the OS to read ahead."""
+        flags = os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_SEQUENTIAL', 0)
+        fd = os.open(file_path, flags)
+        if hasattr(os, 'posix_fadvise'):
+            for advice in (os.POSIX_FADV_SEQUENTIAL, os.POSIX_FADV_NOREUSE):
+                try:
+                    os.posix_fadvise(fd, 0, 0, advice)
+                except OSError:
+                    pass
+        return open(fd, 'rb', buffering=0)
+    
     def _calculate_hash(self, file_path: Path, algorithm: str = 'sha256') -> str:
         """Calculate file hash for verification."""
-        hash_obj = hashlib.new(algorithm)
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(8192), b''):
+        with self._open_sequential(file_path) as f:
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, algorithm).hexdigest()
+            
+            hash_obj = hashlib.new(algorithm)
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
                 hash_obj.update(chunk)
-        return hash_obj.hexdigest()
+            return hash_obj.hexdigest()
 
 
 class InstalledProgramScanner:
@@ -111,6 +290,12 @@ class InstalledProgramScanner:
         r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall",
     ]
     
+    # Registry value names are case-insensitive, so these are matched lowercased.
+    PROGRAM_VALUE_NAMES = frozenset({
+        'displayname', 'displayversion', 'publisher', 'installlocation',
+        'uninstallstring', 'systemcomponent',
+    })
+    
     def __init__(self):
         self.is_windows = os.name == 'nt'
     
@@ -123,33 +308,19 @@ class InstalledProgramScanner:
     
     def _scan_windows_registry(self) -> List[Dict]:
         """Scan Windows Registry for installed programs."""
-        programs = []
-        
         try:
             import winreg
-            
-            for hive in [winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER]:
-                for reg_path in self.REGISTRY_PATHS:
-                    try:
-                        key = winreg.OpenKey(hive, reg_path)
-                        for i in range(winreg.QueryInfoKey(key)[0]):
-                            try:
-                                subkey_name = winreg.EnumKey(key, i)
-                                subkey = winreg.OpenKey(key, subkey_name)
-                                
-                                program = self._read_program_info(subkey, subkey_name, reg_path)
-                                if program and program.get('display_name'):
-                                    programs.append(program)
-                                
-                                winreg.CloseKey(subkey)
-                            except (WindowsError, OSError):
-                                continue
-                        winreg.CloseKey(key)
-                    except (WindowsError, OSError):
-                        continue
         except ImportError:
             return self._get_demo_programs()
         
+        locations = [(hive, reg_path)
+                     for hive in [winreg.HKEY_LOCAL_MACHINE, winreg.HKEY_CURRENT_USER]
+                     for reg_path in self.REGISTRY_PATHS]
+        
+        with ThreadPoolExecutor(max_workers=len(locations)) as executor:
+            results = executor.map(lambda loc: self._enumerate_path(*loc), locations)
+            programs = [program for result in results for program in result]
+        
         seen = set()
         unique_programs = []
         for prog in programs:
@@ -160,32 +331,71 @@ class InstalledProgramScanner:
         
         return unique_programs
     
+    def _enumerate_path(self, hive, reg_path: str) -> List[Dict]:
+        """Read every program under one hive/Uninstall path."""
+        import winreg
+        
+        programs = []
+        try:
+            key = winreg.OpenKey(hive, reg_path)
+        except (WindowsError, OSError):
+            return programs
+        
+        try:
+            for i in range(winreg.QueryInfoKey(key)[0]):
+                try:
+                    subkey_name = winreg.EnumKey(key, i)
+                    subkey = winreg.OpenKey(key, subkey_name)
+                    
+                    program = self._read_program_info(subkey, subkey_name, reg_path)
+                    if program and program.get('display_name'):
+                        programs.append(program)
+                    
+                    winreg.CloseKey(subkey)
+                except (WindowsError, OSError):
+                    continue
+        except (WindowsError, OSError):
+            pass
+        finally:
+            winreg.CloseKey(key)
+        
+        return programs
+    
     def _read_program_info(self, subkey, subkey_name: str, reg_path: str) -> Optional[Dict]:
         """Read program information from a registry subkey."""
         try:
             import winreg
             
-            def get_value(name):
-                try:
-                    return winreg.QueryValueEx(subkey, name)[0]
-                except (WindowsError, OSError):
-                    return None
-            
-            display_name = get_value('DisplayName')
+            try:
+                display_name = winreg.QueryValueEx(subkey, 'DisplayName')[0]
+            except OSError:
+                return None
             if not display_name:
                 return None
             
-            system_component = get_value('SystemComponent')
-            if system_component == 1:
+            values = {}
+            wanted = len(self.PROGRAM_VALUE_NAMES)
+            for i in range(winreg.QueryInfoKey(subkey)[1]):
+                try:
+                    value_name, value_data, _ = winreg.EnumValue(subkey, i)
+                except OSError:
+                    break
+                value_name = value_name.lower()
+                if value_name in self.PROGRAM_VALUE_NAMES:
+                    values[value_name] = value_data
+                    if len(values) == wanted:
+                        break
+            
+            if values.get('systemcomponent') == 1:
                 return None
             
             return {
                 'name': subkey_name,
                 'display_name': display_name,
-                'version': get_value('DisplayVersion'),
-                'publisher': get_value('Publisher'),
-                'install_location': get_value('InstallLocation'),
-                'uninstall_string': get_value('UninstallString'),
+                'version': values.get('displayversion'),
+                'publisher': values.get('publisher'),
+                'install_location': values.get('installlocation'),
+                'uninstall_string': values.get('uninstallstring'),
                 'registry_key': f"{reg_path}\\{subkey_name}"
             }
         except Exception:
@@ -254,49 +464,67 @@ class InstalledProgramScanner:
 class ProgramMatcher:
     """Matches installed programs to installer files."""
     
+    _PARENS_RE = re.compile(r'\(.*?\)')
+    _NUMBER_RE = re.compile(r'\d+(?:\.\d+)*')
+    _PUNCT_RE = re.compile(r'[^\w\s]+')
+    
     def __init__(self):
         self.name_variations = {}
     
     def match(self, programs: List[Dict], installers: List[Dict]) -> List[Tuple[Dict, Optional[Dict]]]:
         """Match installed programs to their corresponding installers."""
-        results = []
+        installer_names = [self._normalize_name((i.get('detected_name') or '').lower()) for i in installers]
+        installer_words = [frozenset(name.split()) for name in installer_names]
         
+        word_index = defaultdict(set)
+        for idx, words in enumerate(installer_words):
+            for word in words:
+                word_index[word].add(idx)
+        
+        results = []
         for program in programs:
-            best_match = self._find_best_match(program, installers)
+            best_match = self._find_best_match(program, installers, installer_names, installer_words, word_index)
             results.append((program, best_match))
         
         return results
     
-    def _find_best_match(self, program: Dict, installers: List[Dict]) -> Optional[Dict]:
+    def _find_best_match(self, program: Dict, installers: List[Dict], installer_names: List[str],
+                         installer_words: List[frozenset], word_index: Dict[str, set]) -> Optional[Dict]:
         """Find the best matching installer for a program."""
         program_name = (program.get('display_name') or program.get('name') or '').lower()
         program_name_clean = self._normalize_name(program_name)
+        if not program_name_clean:
+            return None
+        
+        program_words = frozenset(program_name_clean.split())
+        
+        # Installers sharing no word can still score via substring containment.
+        candidates = set()
+        for word in program_words:
+            candidates.update(word_index.get(word, ()))
+        candidates.update(idx for idx, name in enumerate(installer_names)
+                          if name and (program_name_clean in name or name in program_name_clean))
         
         best_match = None
         best_score = 0
         
-        for installer in installers:
-            installer_name = (installer.get('detected_name') or '').lower()
-            installer_name_clean = self._normalize_name(installer_name)
-            
-            score = self._calculate_match_score(program_name_clean, installer_name_clean)
+        for idx in sorted(candidates):
+            score = self._calculate_match_score(program_name_clean, installer_names[idx],
+                                                program_words, installer_words[idx])
             
             if score > best_score and score >= 0.6:
                 best_score = score
-                best_match = installer
+                best_match = installers[idx]
         
         return best_match
     
     def _normalize_name(self, name: str) -> str:
         """Normalize program/installer name for comparison."""
-        name = name.lower()
-        name = re.sub(r'\(.*?\)', '', name)
-        name = re.sub(r'\d+(\.\d+)*', '', name)
-        name = re.sub(r'[^\w\s]', ' ', name)
-        name = ' '.join(name.split())
-        return name.strip()
+        name = self._NUMBER_RE.sub('', self._PARENS_RE.sub('', name.lower()))
+        return ' '.join(self._PUNCT_RE.sub(' ', name).split())
     
-    def _calculate_match_score(self, name1: str, name2: str) -> float:
+    def _calculate_match_score(self, name1: str, name2: str,
+                               words1: Optional[frozenset] = None, words2: Optional[frozenset] = None) -> float:
         """Calculate similarity score between two names."""
         if not name1 or not name2:
             return 0.0
@@ -307,13 +535,13 @@ class ProgramMatcher:
         if name1 in name2 or name2 in name1:
             return 0.9
         
-        words1 = set(name1.split())
-        words2 = set(name2.split())
+        if words1 is None:
+            words1 = frozenset(name1.split())
+        if words2 is None:
+            words2 = frozenset(name2.split())
         
         if not words1 or not words2:
             return 0.0
         
-        intersection = words1 & words2
-        union = words1 | words2
-        
-        return len(intersection) / len(union)
+        shared = len(words1 & words2)
+        return shared / (len(words1) + len(words2) - shared)
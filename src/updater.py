@@ -3,21 +3,58 @@ Update checker module for finding newer versions of installers.
 Uses Winget manifests and known software update sources.
 """
 import re
+import codecs
 import json
+import time
 import requests
-from typing import Dict, Optional, List
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Iterator, Optional, List, Tuple
 from packaging import version as pkg_version
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import logging
 
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+_SEVENZIP_DOWNLOAD_RE = re.compile(r'https://www\.7-zip\.org/a/7z(?P<maj>\d{2})(?P<min>\d+)-x64\.exe')
+
+_FALLBACK_DATA = MappingProxyType({
+    'chrome': {'version': '120.0.6099.130', 'download_url': 'https://dl.google.com/chrome/install/latest/chrome_installer.exe'},
+    'firefox': {'version': '121.0', 'download_url': 'https://download.mozilla.org/?product=firefox-latest&os=win64&lang=en-US'},
+    '7zip': {'version': '23.01', 'download_url': 'https://www.7-zip.org/a/7z2301-x64.exe'},
+    'vlc': {'version': '3.0.20', 'download_url': 'https://get.videolan.org/vlc/3.0.20/win64/vlc-3.0.20-win64.exe'},
+    'notepadpp': {'version': '8.6', 'download_url': 'https://github.com/notepad-plus-plus/notepad-plus-plus/releases/download/v8.6/npp.8.6.Installer.x64.exe'},
+    'vscode': {'version': '1.85.0', 'download_url': 'https://code.visualstudio.com/sha/download?build=stable&os=win32-x64'},
+    'git': {'version': '2.43.0', 'download_url': 'https://github.com/git-for-windows/git/releases/download/v2.43.0.windows.1/Git-2.43.0-64-bit.exe'},
+    'python': {'version': '3.12.1', 'download_url': 'https://www.python.org/ftp/python/3.12.1/python-3.12.1-amd64.exe'},
+    'nodejs': {'version': '20.10.0', 'download_url': 'https://nodejs.org/dist/v20.10.0/node-v20.10.0-x64.msi'},
+    'putty': {'version': '0.80', 'download_url': 'https://the.earth.li/~sgtatham/putty/latest/w64/putty-64bit-0.80-installer.msi'},
+    'winscp': {'version': '6.1.2', 'download_url': 'https://winscp.net/download/WinSCP-6.1.2-Setup.exe'},
+    'filezilla': {'version': '3.66.1', 'download_url': 'https://download.filezilla-project.org/client/FileZilla_3.66.1_win64_sponsored2-setup.exe'},
+})
+
+
+@lru_cache(maxsize=256)
+def _parse_version(value: str) -> pkg_version.Version:
+    return pkg_version.parse(value)
+
 
 class UpdateChecker:
     """Checks for updates for known software packages."""
     
+    MAX_WORKERS = 16
+    CACHE_TTL = 600
+    
+    _all_known_cache: Optional[Tuple[Dict, ...]] = None
+    
     WINGET_MANIFEST_URL = "https://raw.githubusercontent.com/microsoft/winget-pkgs/master/manifests"
     
     KNOWN_SOFTWARE = {
@@ -78,7 +115,7 @@ class UpdateChecker:
         },
         '7zip': {
             'version_url': 'https://www.7-zip.org/',
-            'download_pattern': r'https://www\.7-zip\.org/a/7z(\d+)-x64\.exe',
+            'download_pattern': _SEVENZIP_DOWNLOAD_RE.pattern,
         },
     }
     
@@ -88,14 +125,45 @@ class UpdateChecker:
         self.session.headers.update({
             'User-Agent': 'InstallerManager/1.0'
         })
+        
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        
+        self._version_cache: Dict[str, Tuple[float, Dict]] = {}
+        
+        self._pattern_index = sorted(
+            dict.fromkeys(
+                (pattern.lower(), key) for key, info in self.KNOWN_SOFTWARE.items() for pattern in info['name_patterns']
+            ),
+            key=lambda item: -len(item[0])
+        )
+        self._pattern_keys = {}
+        self._pattern_ranks = {}
+        for rank, (pattern, key) in enumerate(self._pattern_index):
+            self._pattern_keys.setdefault(pattern, key)
+            self._pattern_ranks.setdefault(pattern, rank)
+        self._pattern_re = re.compile(
+            '(?=(' + '|'.join(re.escape(pattern) for pattern, _ in self._pattern_index) + '))'
+        )
     
-    def check_update(self, detected_name: Optional[str], current_version: Optional[str] = None) -> Dict:
+    def check_update(self, detected_name: Optional[str], current_version: Optional[str] = None,
+                     refresh: bool = False) -> Dict:
         """
         Check if an update is available for the given software.
         Returns dict with: status, latest_version, download_url
+        Latest versions are cached for CACHE_TTL seconds unless refresh is set.
         """
         software_key = self._identify_software(detected_name)
-        
+        latest_info = self._get_latest_version(software_key, refresh) if software_key else None
+        return self._build_update_info(software_key, latest_info, current_version)
+    
+    def _build_update_info(self, software_key: Optional[str], latest_info: Optional[Dict],
+                           current_version: Optional[str]) -> Dict:
+        """Build the update status dict for an identified software key and its latest version info."""
         if not software_key:
             return {
                 'status': 'unknown',
@@ -104,8 +172,6 @@ class UpdateChecker:
                 'message': 'Software not recognized in update database'
             }
         
-        latest_info = self._get_latest_version(software_key)
-        
         if not latest_info or not latest_info.get('version'):
             return {
                 'status': 'update_not_found',
@@ -148,21 +214,39 @@ class UpdateChecker:
         
         name_lower = name.lower().strip()
         
-        for key, info in self.KNOWN_SOFTWARE.items():
-            for pattern in info['name_patterns']:
-                if pattern in name_lower or name_lower in pattern:
-                    return key
+        key = self._pattern_keys.get(name_lower)
+        if key:
+            return key
+        
+        best = len(self._pattern_index)
+        for match in self._pattern_re.finditer(name_lower):
+            best = min(best, self._pattern_ranks[match.group(1)])
+        
+        for i in range(best):
+            pattern, key = self._pattern_index[i]
+            if name_lower in pattern:
+                return key
         
+        if best < len(self._pattern_index):
+            return self._pattern_index[best][1]
         return None
     
-    def _get_latest_version(self, software_key: str) -> Optional[Dict]:
+    def _get_latest_version(self, software_key: str, refresh: bool = False) -> Optional[Dict]:
         """Get the latest version info for a software package."""
+        if not refresh:
+            cached = self._version_cache.get(software_key)
+            if cached and time.monotonic() - cached[0] < self.CACHE_TTL:
+                return cached[1]
+        
+        result = None
         if software_key in self.DIRECT_SOURCES:
             result = self._check_direct_source(software_key)
-            if result:
-                return result
+        if not result:
+            result = self._check_winget_api(software_key)
         
-        return self._check_winget_api(software_key)
+        if result:
+            self._version_cache[software_key] = (time.monotonic(), result)
+        return result
     
     def _check_direct_source(self, software_key: str) -> Optional[Dict]:
         """Check direct update sources for version info."""
@@ -172,10 +256,10 @@ class UpdateChecker:
         
         try:
             if software_key == 'chrome':
-                resp = self.session.get(source['version_url'], timeout=self.timeout)
-                data = resp.json()
-                if data and len(data) > 0:
-                    version = data[0].get('version')
+                with self.session.get(source['version_url'], timeout=self.timeout, stream=True) as resp:
+                    release = self._read_first_json_item(resp)
+                if release:
+                    version = release.get('version')
                     return {
                         'version': version,
                         'download_url': source['download_url']
@@ -183,21 +267,44 @@ class UpdateChecker:
             
             elif software_key == '7zip':
                 resp = self.session.get(source['version_url'], timeout=self.timeout)
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    match = re.search(source['download_pattern'], href)
-                    if match:
-                        version_num = match.group(1)
-                        version = f"{version_num[0:2]}.{version_num[2:]}" if len(version_num) > 2 else version_num
-                        return {
-                            'version': version,
-                            'download_url': urljoin(source['version_url'], href)
-                        }
+                match = _SEVENZIP_DOWNLOAD_RE.search(resp.text)
+                if match:
+                    return {
+                        'version': f"{match['maj']}.{match['min']}",
+                        'download_url': match.group(0)
+                    }
         
         except Exception as e:
-            logger.debug(f"Direct source check failed for {software_key}: {e}")
+            logger.debug("Direct source check failed for %s: %s", software_key, e)
+        
+        return None
+    
+    @staticmethod
+    def _read_first_json_item(resp) -> Optional[Dict]:
+        """Decode only the first object of a streamed JSON array, leaving the rest unread."""
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf-8')()
+        text = ''
+        
+        for chunk in resp.iter_content(chunk_size=4096):
+            text += utf8.decode(chunk)
+            head = text.lstrip()
+            if not head:
+                continue
+            if head[0] != '[':
+                return None
+            
+            start = head.find('{')
+            if start == -1:
+                if head[1:].lstrip().startswith(']'):
+                    return None
+                continue
+            
+            try:
+                item, _ = decoder.raw_decode(head, start)
+                return item
+            except ValueError:
+                continue
         
         return None
     
@@ -216,7 +323,7 @@ class UpdateChecker:
             resp = self.session.get(api_url, timeout=self.timeout)
             
             if resp.status_code == 200:
-                data = resp.json()
+                data = _json_loads(resp.content)
                 versions = data.get('Versions', [])
                 if versions:
                     latest = versions[0]
@@ -225,36 +332,25 @@ class UpdateChecker:
                         'download_url': latest.get('Installers', [{}])[0].get('InstallerUrl')
                     }
         except Exception as e:
-            logger.debug(f"Winget API check failed for {software_key}: {e}")
+            logger.debug("Winget API check failed for %s: %s", software_key, e)
         
         return self._get_fallback_version(software_key)
     
     def _get_fallback_version(self, software_key: str) -> Optional[Dict]:
         """Return fallback version data for demo/offline mode."""
-        fallback_data = {
-            'chrome': {'version': '120.0.6099.130', 'download_url': 'https://dl.google.com/chrome/install/latest/chrome_installer.exe'},
-            'firefox': {'version': '121.0', 'download_url': 'https://download.mozilla.org/?product=firefox-latest&os=win64&lang=en-US'},
-            '7zip': {'version': '23.01', 'download_url': 'https://www.7-zip.org/a/7z2301-x64.exe'},
-            'vlc': {'version': '3.0.20', 'download_url': 'https://get.videolan.org/vlc/3.0.20/win64/vlc-3.0.20-win64.exe'},
-            'notepadpp': {'version': '8.6', 'download_url': 'https://github.com/notepad-plus-plus/notepad-plus-plus/releases/download/v8.6/npp.8.6.Installer.x64.exe'},
-            'vscode': {'version': '1.85.0', 'download_url': 'https://code.visualstudio.com/sha/download?build=stable&os=win32-x64'},
-            'git': {'version': '2.43.0', 'download_url': 'https://github.com/git-for-windows/git/releases/download/v2.43.0.windows.1/Git-2.43.0-64-bit.exe'},
-            'python': {'version': '3.12.1', 'download_url': 'https://www.python.org/ftp/python/3.12.1/python-3.12.1-amd64.exe'},
-            'nodejs': {'version': '20.10.0', 'download_url': 'https://nodejs.org/dist/v20.10.0/node-v20.10.0-x64.msi'},
-            'putty': {'version': '0.80', 'download_url': 'https://the.earth.li/~sgtatham/putty/latest/w64/putty-64bit-0.80-installer.msi'},
-            'winscp': {'version': '6.1.2', 'download_url': 'https://winscp.net/download/WinSCP-6.1.2-Setup.exe'},
-            'filezilla': {'version': '3.66.1', 'download_url': 'https://download.filezilla-project.org/client/FileZilla_3.66.1_win64_sponsored2-setup.exe'},
-        }
-        return fallback_data.get(software_key)
+        return _FALLBACK_DATA.get(software_key)
     
     def _compare_versions(self, version1: str, version2: str) -> int:
         """
         Compare two version strings.
         Returns: -1 if v1 < v2, 0 if v1 == v2, 1 if v1 > v2
         """
+        if version1 == version2:
+            return 0
+        
         try:
-            v1 = pkg_version.parse(version1)
-            v2 = pkg_version.parse(version2)
+            v1 = _parse_version(version1)
+            v2 = _parse_version(version2)
             
             if v1 < v2:
                 return -1
@@ -263,35 +359,47 @@ class UpdateChecker:
             else:
                 return 0
         except Exception:
-            if version1 == version2:
-                return 0
             return -1 if version1 < version2 else 1
     
     def get_all_known_software(self) -> List[Dict]:
         """Get list of all software that can be checked for updates."""
-        result = []
-        for key, info in self.KNOWN_SOFTWARE.items():
-            result.append({
-                'key': key,
-                'winget_id': info.get('winget_id'),
-                'name_patterns': info['name_patterns']
-            })
-        return result
+        cls = UpdateChecker
+        if cls._all_known_cache is None:
+            cls._all_known_cache = tuple(
+                {
+                    'key': key,
+                    'winget_id': info.get('winget_id'),
+                    'name_patterns': info['name_patterns']
+                }
+                for key, info in self.KNOWN_SOFTWARE.items()
+            )
+        return list(cls._all_known_cache)
     
     def check_multiple(self, installers: List[Dict], progress_callback=None) -> List[Dict]:
         """Check updates for multiple installers with optional progress callback."""
-        results = []
+        return list(self.iter_check_multiple(installers, progress_callback))
+    
+    def iter_check_multiple(self, installers: List[Dict], progress_callback=None) -> Iterator[Dict]:
+        """
+        Yield update results for multiple installers in input order.
+        Each distinct software package is looked up once, however many installers share it.
+        """
         total = len(installers)
+        if not installers:
+            return
         
-        for i, installer in enumerate(installers):
-            name = installer.get('detected_name', '')
-            version = installer.get('detected_version')
-            
-            update_info = self.check_update(name, version)
-            update_info['installer'] = installer
-            results.append(update_info)
-            
-            if progress_callback:
-                progress_callback(i + 1, total, installer.get('file_name', ''))
+        keys = [self._identify_software(installer.get('detected_name', '')) for installer in installers]
+        distinct_keys = [key for key in dict.fromkeys(keys) if key]
         
-        return results
+        with ThreadPoolExecutor(max_workers=max(1, min(self.MAX_WORKERS, len(distinct_keys)))) as executor:
+            futures = {key: executor.submit(self._get_latest_version, key) for key in distinct_keys}
+            
+            for i, (installer, key) in enumerate(zip(installers, keys), 1):
+                latest_info = futures[key].result() if key else None
+                update_info = self._build_update_info(key, latest_info, installer.get('detected_version'))
+                update_info['installer'] = installer
+                
+                if progress_callback:
+                    progress_callback(i, total, installer.get('file_name', ''))
+                
+                yield update_info